@@ -1,62 +1,136 @@
 # --------------------------------------------------
 # main.py
 # --------------------------------------------------
-from fastapi import FastAPI, File, UploadFile
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel
 from typing import List, Optional
+from contextlib import asynccontextmanager
+from pathlib import PurePosixPath
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from difflib import SequenceMatcher
+import msgspec
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.json as pajson
+import pyarrow.parquet as pq
 import io
 import os
-import sys
-import traceback
+import logging
 import requests
 import uvicorn
-from utils.global_cache import uploaded_data_cache, google_auth_cache
-from openai import OpenAI
-from fastapi.responses import RedirectResponse, JSONResponse
+from utils.logging_config import setup_logging, stop_logging
+
+# Before the imports below: utils.http_client warns at import time, and the
+# warning would otherwise bypass the configured handler.
+setup_logging()
+logger = logging.getLogger(__name__)
+
+from utils.global_cache import CachedUpload, google_auth_cache, load_upload, store_upload
+from utils.http_client import close_http_client, open_http_client
+from openai import AsyncOpenAI
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from requests.adapters import HTTPAdapter
 from requests_oauthlib import OAuth2Session
 
+# rapidfuzz provides the compiled scorer used by lead matching; without it the
+# matcher falls back to difflib, which is correct but far slower.
+try:
+    from rapidfuzz import process, fuzz
+except ImportError:
+    process = fuzz = None
+    logger.warning("⚠️ rapidfuzz not installed; lead matching will use difflib")
+
 # --------------------------------------------------
 # Initialize FastAPI
 # --------------------------------------------------
-app = FastAPI()
-print("✅ FastAPI app initialized", flush=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()  # No-op on first start; restarts it after a previous shutdown
+    open_http_client()
+    warmup()  # defined below, with the handlers it exercises
+    yield
+    await close_http_client()
+    stop_logging()
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+logger.debug("✅ FastAPI app initialized")
 
 # --------------------------------------------------
 # Import settings_routes dynamically (with error capture)
 # --------------------------------------------------
 try:
     from routes import settings_routes
-    print("✅ settings_routes imported successfully", file=sys.stderr)
+    logger.debug("✅ settings_routes imported successfully")
     app.include_router(
         settings_routes.router,
         prefix="/settings",
         tags=["Settings"]
     )
 except Exception as e:
-    print("⚠️  SETTINGS ROUTE IMPORT FAILED:", e, file=sys.stderr)
-    traceback.print_exc()
+    logger.exception("⚠️  SETTINGS ROUTE IMPORT FAILED: %s", e)
 
 # --------------------------------------------------
 # Import google_routes dynamically (with error capture)
 # --------------------------------------------------
 try:
     from routes import google_routes
-    print("✅ google_routes imported successfully", file=sys.stderr)
+    logger.debug("✅ google_routes imported successfully")
     app.include_router(
         google_routes.router,
         prefix="",
         tags=["Google"]
     )
 except Exception as e:
-    print("⚠️  GOOGLE ROUTE IMPORT FAILED:", e, file=sys.stderr)
-    traceback.print_exc()
+    logger.exception("⚠️  GOOGLE ROUTE IMPORT FAILED: %s", e)
 
 # --------------------------------------------------
 # Initialize OpenAI Client
 # --------------------------------------------------
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# --------------------------------------------------
+# Request Body Decoding (msgspec)
+# --------------------------------------------------
+# Large JSON bodies are decoded and validated by msgspec in a single pass.
+# The matching Pydantic models are kept only to document the body in OpenAPI.
+def _request_body_schema(model, required: bool = True) -> dict:
+    """Build an inline OpenAPI requestBody from a Pydantic model."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def inline(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return inline(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: inline(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [inline(v) for v in node]
+        return node
+
+    return {
+        "requestBody": {
+            "required": required,
+            "content": {"application/json": {"schema": inline(schema)}}
+        }
+    }
+
+
+async def _decode_body(request: Request, decoder: msgspec.json.Decoder):
+    try:
+        return decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        # Same 422 body shape as FastAPI's own validation errors
+        raise RequestValidationError([{"type": "value_error", "loc": ("body",), "msg": str(e), "input": None}])
 
 # --------------------------------------------------
 # Root Endpoint
@@ -75,13 +149,43 @@ class LeadRecord(BaseModel):
 
 class AnalyzeRequest(BaseModel):
     ad_spend: float
-    leads: List[LeadRecord]
+    leads: List[LeadRecord] = []
+    # Bulk alternative to leads: plain revenue values, summed without
+    # building a record per lead
+    revenues: List[float] = []
 
 
-@app.post("/analyze_roi")
-def analyze_roi(request: Optional[AnalyzeRequest] = None):
+# gc=False: lead records only hold str/float fields and can never form
+# reference cycles, so large lead lists skip garbage-collector tracking.
+class LeadRecordStruct(msgspec.Struct, gc=False):
+    email: str
+    revenue: Optional[float] = 0.0
+
+
+class AnalyzeRequestStruct(msgspec.Struct):
+    ad_spend: float
+    leads: List[LeadRecordStruct] = []
+    revenues: List[float] = []
+
+
+# strict=False keeps Pydantic's lax coercions (e.g. "12.5" -> 12.5) for existing clients
+_analyze_decoder = msgspec.json.Decoder(AnalyzeRequestStruct, strict=False)
+
+
+@app.post("/analyze_roi", openapi_extra=_request_body_schema(AnalyzeRequest, required=False))
+async def analyze_roi(raw_request: Request):
+    request = None
+    if await raw_request.body():
+        request = await _decode_body(raw_request, _analyze_decoder)
+
     if request:
-        total_revenue = sum(lead.revenue for lead in request.leads)
+        revenues = np.fromiter(
+            (lead.revenue or 0.0 for lead in request.leads),
+            dtype=np.float64, count=len(request.leads)
+        )
+        total_revenue = float(revenues.sum())
+        if request.revenues:
+            total_revenue += float(np.add.reduce(np.asarray(request.revenues, dtype=np.float64)))
         roi = total_revenue / request.ad_spend if request.ad_spend > 0 else 0
         return {
             "source": "input",
@@ -90,15 +194,17 @@ def analyze_roi(request: Optional[AnalyzeRequest] = None):
             "roi": round(roi, 2)
         }
 
-    if "latest" not in uploaded_data_cache:
+    upload = load_upload()
+    if upload is None:
         return {"error": "No data provided and no cached upload found."}
 
-    df = uploaded_data_cache["latest"]
-    if not {"email", "revenue"}.issubset(df.columns):
+    if not upload.has_roi_columns:
         return {"error": "Cached data missing required columns: email, revenue."}
+    if upload.total_revenue is None:
+        return {"error": "Cached revenue column is not numeric."}
 
     ad_spend = 1000.0
-    total_revenue = df["revenue"].sum()
+    total_revenue = upload.total_revenue
     roi = total_revenue / ad_spend if ad_spend > 0 else 0
 
     return {
@@ -116,29 +222,246 @@ class LeadMatchRequest(BaseModel):
     crm_leads: List[str]
 
 
-@app.post("/match_leads")
-def match_leads(request: LeadMatchRequest):
+# rapidfuzz releases the GIL while scoring, so independent domain blocks
+# can be scored in parallel threads. LEAD_MATCH_WORKERS caps the threads
+# per process; lower it when running several uvicorn workers per host.
+MATCH_WORKERS = max(1, int(os.getenv("LEAD_MATCH_WORKERS") or os.cpu_count() or 1))
+_match_executor = ThreadPoolExecutor(max_workers=MATCH_WORKERS)
+
+
+def _score_window(ads: List[str], crm: List[str], workers: int = MATCH_WORKERS):
+    """Return (ad_index, crm_index, score) for pairs in ads x crm scoring above 80."""
+    if process is not None and len(ads) == 1:
+        # One ad (common after length/domain blocking): score it directly
+        # with the cutoff instead of allocating a 1 x m matrix.
+        hits = process.extract(ads[0], crm, scorer=fuzz.ratio, score_cutoff=80, limit=None)
+        return [(0, c, score) for _, score, c in hits if score > 80]
+
+    if process is not None:
+        scores = process.cdist(
+            ads, crm, scorer=fuzz.ratio, score_cutoff=80, workers=workers, dtype=np.float32
+        )
+        ad_idx, crm_idx = np.nonzero(scores > 80)
+        return list(zip(ad_idx.tolist(), crm_idx.tolist(), scores[ad_idx, crm_idx].tolist()))
+
+    pairs = []
+    matcher = SequenceMatcher(None)
+    for c, crm_email in enumerate(crm):
+        # SequenceMatcher caches its analysis of seq2, so vary seq1 inside
+        matcher.set_seq2(crm_email)
+        for a, ad_email in enumerate(ads):
+            matcher.set_seq1(ad_email)
+            if matcher.real_quick_ratio() > 0.8 and matcher.quick_ratio() > 0.8:
+                ratio = matcher.ratio()
+                if ratio > 0.8:
+                    pairs.append((a, c, ratio * 100))
+    return pairs
+
+
+def _length_index(crm_lower: List[str], indices: List[int]):
+    """Sort a block of CRM emails by length: (crm indices, emails, lengths)."""
+    crm_order = sorted(indices, key=lambda j: len(crm_lower[j]))
+    crm_sorted = [crm_lower[j] for j in crm_order]
+    return crm_order, crm_sorted, [len(e) for e in crm_sorted]
+
+
+def _score_email_pairs(ads_lower: List[str], crm_block, workers: int = MATCH_WORKERS):
+    """Return (ad_index, crm_index, score) for every pair scoring above 80."""
+    # Both scorers can only exceed 80 when 2 * longer < 3 * shorter, so each
+    # group of equal-length ads is scored against a length window of CRM
+    # emails instead of the whole block.
+    crm_order, crm_sorted, crm_lengths = crm_block
+
+    ads_by_length = defaultdict(list)
+    for i, email in enumerate(ads_lower):
+        ads_by_length[len(email)].append(i)
+
+    pairs = []
+    for length, ad_indices in ads_by_length.items():
+        lo = bisect_right(crm_lengths, (2 * length) // 3)
+        hi = bisect_left(crm_lengths, (3 * length + 1) // 2)
+        if lo >= hi:
+            continue
+        window = _score_window([ads_lower[i] for i in ad_indices], crm_sorted[lo:hi], workers)
+        for a, c, score in window:
+            pairs.append((ad_indices[a], crm_order[lo + c], score))
+    return pairs
+
+
+class LeadMatchBatchRequest(BaseModel):
+    jobs: List[LeadMatchRequest]
+
+
+class LeadMatchStruct(msgspec.Struct):
+    ads_leads: List[str]
+    crm_leads: List[str]
+
+
+class LeadMatchBatchStruct(msgspec.Struct):
+    jobs: List[LeadMatchStruct]
+
+
+_match_decoder = msgspec.json.Decoder(LeadMatchStruct, strict=False)
+_match_batch_decoder = msgspec.json.Decoder(LeadMatchBatchStruct, strict=False)
+
+
+def _dedupe_lower(emails):
+    """Return unique normalized emails and, for each, its original indices."""
+    positions = defaultdict(list)
+    for i, email in enumerate(emails):
+        positions[email.strip().lower()].append(i)
+    return list(positions), list(positions.values())
+
+
+@lru_cache(maxsize=32)
+def _prepare_crm(crm_leads: tuple):
+    """Dedupe a CRM list and build its length-sorted domain blocks.
+
+    Everything derived from the CRM list alone is computed here once, so
+    repeated requests and batch jobs only do per-ad work.
+    """
+    crm_lower, crm_positions = _dedupe_lower(crm_leads)
+    crm_by_domain = defaultdict(list)
+    for j, email in enumerate(crm_lower):
+        crm_by_domain[email.rpartition("@")[2]].append(j)
+
+    blocks = {
+        domain: _length_index(crm_lower, indices)
+        for domain, indices in crm_by_domain.items()
+    }
+    all_crm = _length_index(crm_lower, range(len(crm_lower)))
+    crm_index = {email: j for j, email in enumerate(crm_lower)}
+    return blocks, all_crm, crm_positions, crm_index
+
+
+def _match_by_domain(ads_lower: List[str], crm):
+    """Score pairs within email-domain blocks instead of the full n*m grid.
+
+    Ads with no match in their own domain block (typically a typo'd domain,
+    either side) get a second pass against every CRM email; ads whose
+    domain never appears in the CRM list go straight to that pass.
+    """
+    blocks, all_crm = crm[0], crm[1]
+
+    ads_by_domain = defaultdict(list)
+    for i, email in enumerate(ads_lower):
+        ads_by_domain[email.rpartition("@")[2]].append(i)
+
+    jobs = [(ad_indices, blocks.get(domain, all_crm)) for domain, ad_indices in ads_by_domain.items()]
+
+    def score_block(job, workers):
+        ad_indices, block = job
+        scored = _score_email_pairs([ads_lower[i] for i in ad_indices], block, workers)
+        return [(ad_indices[a], j, score) for a, j, score in scored]
+
+    # A single block uses rapidfuzz's own multithreading; many blocks are
+    # spread over the pool instead. The difflib fallback holds the GIL.
+    if process is None or len(jobs) <= 1:
+        results = [score_block(job, MATCH_WORKERS) for job in jobs]
+    else:
+        results = list(_match_executor.map(lambda job: score_block(job, 1), jobs))
+    pairs = [pair for block_pairs in results for pair in block_pairs]
+
+    # Second pass for ads that found nothing in a domain block of their own.
+    # Their own block produced no hits, so rescoring it along with the rest
+    # of the list only adds matches from other domains.
+    matched = {a for a, _, _ in pairs}
+    missed = [
+        i
+        for (ad_indices, block), _ in zip(jobs, results)
+        if block is not all_crm
+        for i in ad_indices
+        if i not in matched
+    ]
+    if missed:
+        pairs.extend(score_block((missed, all_crm), MATCH_WORKERS))
+    return pairs
+
+
+def _match_lead_lists(ads_leads: List[str], crm_leads: List[str]):
+    # Score each distinct email once, then fan results back out to every
+    # original position it occurred at.
+    ads_lower, ads_positions = _dedupe_lower(ads_leads)
+    crm = _prepare_crm(tuple(crm_leads))
+    crm_positions, crm_index = crm[2], crm[3]
+
+    # Exact matches are settled with a set lookup; only the rest are scored
+    matched = []
+    residual = []
+    for a, email in enumerate(ads_lower):
+        c = crm_index.get(email)
+        if c is None:
+            residual.append(a)
+        else:
+            matched.append((a, c, 100.0))
+    if residual:
+        matched.extend(
+            (residual[r], c, score)
+            for r, c, score in _match_by_domain([ads_lower[a] for a in residual], crm)
+        )
+
+    pairs = [
+        (i, j, score)
+        for a, c, score in matched
+        for i in ads_positions[a]
+        for j in crm_positions[c]
+    ]
+    pairs.sort()
+
     matches = []
-    for ad_email in request.ads_leads:
-        for crm_email in request.crm_leads:
-            ratio = SequenceMatcher(None, ad_email.lower(), crm_email.lower()).ratio()
-            if ratio > 0.8:
-                matches.append({
-                    "ad_email": ad_email,
-                    "crm_email": crm_email,
-                    "match_score": round(ratio, 2)
-                })
+    for i, j, score in pairs:
+        matches.append({
+            "ad_email": ads_leads[i],
+            "crm_email": crm_leads[j],
+            "match_score": round(score / 100, 2)
+        })
     return {"matches": matches, "total_matches": len(matches)}
 
+
+@app.post("/match_leads", openapi_extra=_request_body_schema(LeadMatchRequest))
+async def match_leads(raw_request: Request):
+    """Fuzzy-match ad lead emails against CRM emails (case-insensitive).
+
+    An ad email with an exact CRM match (ignoring case and surrounding
+    whitespace) is paired with that email only, at a score of 1.0; the
+    remaining ads are fuzzy-matched.
+
+    match_score is the normalized Indel similarity (rapidfuzz fuzz.ratio /
+    Levenshtein.ratio) of the two stripped, lowercased emails. Each ad is
+    paired with the CRM emails of its own domain scoring above 0.8; an ad
+    with no such match is paired with any CRM email scoring above 0.8.
+    Without rapidfuzz, difflib's Ratcliff-Obershelp ratio is used instead,
+    which can differ slightly for the same pair.
+    """
+    request = await _decode_body(raw_request, _match_decoder)
+    return await run_in_threadpool(_match_lead_lists, request.ads_leads, request.crm_leads)
+
+
+def _match_batch(jobs):
+    return [_match_lead_lists(job.ads_leads, job.crm_leads) for job in jobs]
+
+
+@app.post("/match_leads_batch", openapi_extra=_request_body_schema(LeadMatchBatchRequest))
+async def match_leads_batch(raw_request: Request):
+    """Run several match jobs in one call; shared CRM lists are prepared once."""
+    request = await _decode_body(raw_request, _match_batch_decoder)
+    return {"results": await run_in_threadpool(_match_batch, request.jobs)}
+
 # --------------------------------------------------
 # ROI Reporting
 # --------------------------------------------------
+_REPORT_SUMMARY = (
+    "Your total revenue of ${revenue:,.2f} generated an ROI of {roi:.2f}x "
+    "based on an ad spend of ${spend:,.2f}."
+).format
+
+
 @app.get("/report")
 def get_report(ad_spend: float, total_revenue: float):
     if ad_spend <= 0:
         return {"error": "Ad spend must be greater than zero."}
     roi = total_revenue / ad_spend
-    summary = f"Your total revenue of ${total_revenue:,.2f} generated an ROI of {roi:.2f}x based on an ad spend of ${ad_spend:,.2f}."
+    summary = _REPORT_SUMMARY(revenue=total_revenue, roi=roi, spend=ad_spend)
     return {
         "ad_spend": ad_spend,
         "total_revenue": total_revenue,
@@ -149,44 +472,148 @@ def get_report(ad_spend: float, total_revenue: float):
 # --------------------------------------------------
 # File Upload + Cache
 # --------------------------------------------------
+EMAIL_DICT_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+
+def _dataframe_to_table(df: pd.DataFrame) -> pa.Table:
+    """Convert a parsed DataFrame to an Arrow table for caching."""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns have no single Arrow type; keep them as text
+        mixed = df.select_dtypes("object").columns
+        return pa.Table.from_pandas(df.astype({c: str for c in mixed}), preserve_index=False)
+
+
+def _parse_csv(source) -> pa.Table:
+    return pacsv.read_csv(
+        source,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20),
+        # CRM exports carry multi-line notes/addresses in quoted cells
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(column_types={"email": EMAIL_DICT_TYPE}),
+    )
+
+
+def _parse_excel(source) -> pa.Table:
+    return _dataframe_to_table(pd.read_excel(source, engine="calamine"))
+
+
+def _parse_json(source) -> pa.Table:
+    try:
+        data = orjson.loads(source.read())
+    except orjson.JSONDecodeError:
+        # Not a single JSON document; parse it as JSON lines
+        source.seek(0)
+        return pajson.read_json(source)
+    df = pd.DataFrame.from_records(data) if isinstance(data, list) else pd.DataFrame(data)
+    return _dataframe_to_table(df)
+
+
+def _parse_parquet(source) -> pa.Table:
+    return pq.read_table(source)
+
+
+# Keyed on the file's last suffix, e.g. "leads.2024.CSV" -> ".csv"
+UPLOAD_PARSERS = {
+    ".csv": _parse_csv,
+    ".xls": _parse_excel,
+    ".xlsx": _parse_excel,
+    ".json": _parse_json,
+    ".parquet": _parse_parquet,
+}
+
+
+def _build_upload(parser, source) -> CachedUpload:
+    # UploadFile is backed by a SpooledTemporaryFile; parse straight from it
+    # rather than holding a second full copy of the upload in memory.
+    source.seek(0)
+    table = parser(source)
+
+    # Emails repeat across rows; store each distinct value once
+    if "email" in table.column_names and pa.types.is_string(table.schema.field("email").type):
+        table = table.set_column(
+            table.column_names.index("email"), "email", table["email"].dictionary_encode()
+        )
+    return CachedUpload.from_table(table)
+
+
 @app.post("/upload_data")
 async def upload_data(file: UploadFile = File(...)):
     filename = file.filename.lower()
-    content = await file.read()
-
-    if filename.endswith(".csv"):
-        df = pd.read_csv(io.BytesIO(content))
-    elif filename.endswith((".xls", ".xlsx")):
-        df = pd.read_excel(io.BytesIO(content))
-    elif filename.endswith(".json"):
-        df = pd.read_json(io.BytesIO(content))
-    else:
-        return {"error": "Unsupported file type. Please upload CSV, Excel, or JSON."}
+    parser = UPLOAD_PARSERS.get(PurePosixPath(filename).suffix)
+    if parser is None:
+        return {"error": "Unsupported file type. Please upload CSV, Excel, JSON, or Parquet."}
 
-    uploaded_data_cache["latest"] = df
+    # Parsing and the shared-store write block; keep them off the event loop
+    upload = await run_in_threadpool(_build_upload, parser, file.file)
+    try:
+        await run_in_threadpool(store_upload, upload)
+    except Exception as e:
+        return {"error": f"Could not cache the upload for all workers ({e}). "
+                         "Check free space at UPLOAD_STORE_PATH."}
     return {
         "filename": filename,
-        "rows": len(df),
-        "columns": list(df.columns),
+        "rows": upload.row_count,
+        "columns": upload.columns,
         "message": "File uploaded and cached successfully."
     }
 
 
 @app.get("/cache_status")
 def cache_status():
-    if "latest" not in uploaded_data_cache:
+    upload = load_upload()
+    if upload is None:
         return {"cached": False, "message": "No data currently cached."}
-    df = uploaded_data_cache["latest"]
-    return {"cached": True, "rows": len(df), "columns": list(df.columns)}
+    return {"cached": True, "rows": upload.row_count, "columns": upload.columns}
 
 # --------------------------------------------------
-# AI Summary Generation (OpenAI)
+# Startup Warmup
 # --------------------------------------------------
-@app.get("/generate_summary")
-def generate_summary(ad_spend: float = 0.0, total_revenue: float = 0.0):
-    if ad_spend <= 0 or total_revenue <= 0:
-        return {"error": "Both ad_spend and total_revenue must be greater than zero."}
+def warmup():
+    """Run the heavy import/first-call paths once before serving traffic."""
+    try:
+        # Near (not exact) matches, so the fuzzy path and its executor run too
+        _match_lead_lists(["warmup1@a.com", "warmup2@b.com"], ["warmup@a.com", "warmup@b.com"])
+        CachedUpload.from_table(_parse_csv(io.BytesIO(b"email,revenue\nwarmup@a.com,1\n")))
+        _analyze_decoder.decode(b'{"ad_spend": 1, "leads": [{"email": "warmup@a.com"}]}')
+        logger.debug("✅ Warmup complete")
+    except Exception as e:
+        logger.warning("⚠️ Warmup failed: %s", e)
 
+# --------------------------------------------------
+# AI Summary Generation (OpenAI)
+# --------------------------------------------------
+# Summaries keyed on integer cents so equal inputs share one OpenAI call.
+# Cents (not coarser buckets) because the figures are quoted in the text.
+_summary_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_summary_inflight = {}
+SUMMARY_CACHE_SIZE = 2048
+
+
+async def _cached_summary(spend_cents: int, revenue_cents: int) -> str:
+    """Return the OpenAI summary for these figures, reusing cached results.
+
+    Concurrent misses for the same key wait on a single in-flight request
+    instead of each calling OpenAI.
+    """
+    key = (spend_cents, revenue_cents)
+    if key in _summary_cache:
+        _summary_cache.move_to_end(key)
+        return _summary_cache[key]
+
+    task = _summary_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_request_summary(spend_cents, revenue_cents))
+        _summary_inflight[key] = task
+        task.add_done_callback(lambda _: _summary_inflight.pop(key, None))
+    # Shield so one client disconnecting doesn't cancel the shared request
+    return await asyncio.shield(task)
+
+
+async def _request_summary(spend_cents: int, revenue_cents: int) -> str:
+    ad_spend = spend_cents / 100
+    total_revenue = revenue_cents / 100
     roi = total_revenue / ad_spend
     gain = total_revenue - ad_spend
 
@@ -200,17 +627,37 @@ def generate_summary(ad_spend: float = 0.0, total_revenue: float = 0.0):
         f"Use a confident, client-friendly tone with clear business insight."
     )
 
+    response = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a marketing performance analyst."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=250,
+        temperature=0.7
+    )
+    summary = response.choices[0].message.content.strip()
+
+    _summary_cache[(spend_cents, revenue_cents)] = summary
+    if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+    return summary
+
+
+@app.get("/generate_summary")
+async def generate_summary(ad_spend: float = 0.0, total_revenue: float = 0.0):
+    # Validate the cent amounts the summary is built from; sub-cent inputs
+    # round to $0.00 and are rejected like zero.
+    spend_cents = round(ad_spend * 100)
+    revenue_cents = round(total_revenue * 100)
+    if spend_cents <= 0 or revenue_cents <= 0:
+        return {"error": "Both ad_spend and total_revenue must be greater than zero."}
+
+    roi = total_revenue / ad_spend
+    gain = total_revenue - ad_spend
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a marketing performance analyst."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=250,
-            temperature=0.7
-        )
-        ai_summary = response.choices[0].message.content.strip()
+        ai_summary = await _cached_summary(spend_cents, revenue_cents)
     except Exception as e:
         return {"error": str(e)}
 
@@ -239,9 +686,21 @@ SCOPE = [
     "https://www.googleapis.com/auth/analytics.readonly"
 ]
 
+# Every OAuth2Session mounts this one adapter, so token requests reuse its
+# keep-alive pool instead of opening a fresh TLS connection each time.
+# (Sessions must not be close()d, which would close the shared pool.)
+_oauth_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50)
+
+
+def _oauth_session(**kwargs) -> OAuth2Session:
+    oauth = OAuth2Session(GOOGLE_CLIENT_ID, redirect_uri=REDIRECT_URI, **kwargs)
+    oauth.mount("https://", _oauth_adapter)
+    return oauth
+
+
 @app.get("/auth/login")
 def google_login():
-    oauth = OAuth2Session(GOOGLE_CLIENT_ID, redirect_uri=REDIRECT_URI, scope=SCOPE)
+    oauth = _oauth_session(scope=SCOPE)
     authorization_url, state = oauth.authorization_url(
         AUTHORIZATION_BASE_URL, access_type="offline", prompt="consent"
     )
@@ -251,11 +710,28 @@ def google_login():
 # --------------------------------------------------
 # Google OAuth Callback
 # --------------------------------------------------
+def _persist_google_tokens(token: dict):
+    """Store Google tokens in the settings DB (best effort)."""
+    try:
+        from routes.settings_routes import update_or_create_key
+        refresh_token = token.get("refresh_token")
+        access_token = token.get("access_token")
+        if refresh_token:
+            update_or_create_key(service_name="google_ads_refresh", api_key=refresh_token)
+        if access_token:
+            update_or_create_key(service_name="google_ads_access", api_key=access_token)
+        logger.debug("✅ Google Ads tokens saved to database")
+    except Exception as e:
+        logger.warning("⚠️ Failed to persist Google tokens: %s", e)
+
+
 @app.get("/auth/callback")
-def google_callback(code: str):
+async def google_callback(code: str):
     """Handle OAuth2 callback from Google and store tokens."""
-    oauth = OAuth2Session(GOOGLE_CLIENT_ID, redirect_uri=REDIRECT_URI)
-    token = oauth.fetch_token(
+    oauth = _oauth_session()
+    # requests_oauthlib is blocking; keep the token exchange off the event loop
+    token = await run_in_threadpool(
+        oauth.fetch_token,
         TOKEN_URL,
         client_secret=GOOGLE_CLIENT_SECRET,
         code=code
@@ -265,17 +741,7 @@ def google_callback(code: str):
     google_auth_cache["latest"] = token
 
     # ✅ Optional: persist in DB
-    try:
-        from routes.settings_routes import update_or_create_key
-        refresh_token = token.get("refresh_token")
-        access_token = token.get("access_token")
-        if refresh_token:
-            update_or_create_key(service_name="google_ads_refresh", api_key=refresh_token)
-        if access_token:
-            update_or_create_key(service_name="google_ads_access", api_key=access_token)
-        print("✅ Google Ads tokens saved to database", file=sys.stderr)
-    except Exception as e:
-        print(f"⚠️ Failed to persist Google tokens: {e}", file=sys.stderr)
+    await run_in_threadpool(_persist_google_tokens, token)
 
     # ✅ Prepare preview for response
     safe_token = {
@@ -286,7 +752,7 @@ def google_callback(code: str):
         "token_type": token.get("token_type"),
     }
 
-    return JSONResponse({
+    return ORJSONResponse({
         "status": "success",
         "message": "Google authorization complete. Tokens cached and stored in database.",
         "token_preview": safe_token
@@ -297,15 +763,14 @@ def google_callback(code: str):
 # --------------------------------------------------
 try:
     from routes import email_route
-    print("✅ email_route imported successfully", file=sys.stderr)
+    logger.debug("✅ email_route imported successfully")
     app.include_router(
         email_route.router,
         prefix="/api",
         tags=["Email"]
     )
 except Exception as e:
-    print("⚠️ EMAIL ROUTE IMPORT FAILED:", e, file=sys.stderr)
-    traceback.print_exc()
+    logger.exception("⚠️ EMAIL ROUTE IMPORT FAILED: %s", e)
 
 
 # --------------------------------------------------
@@ -313,12 +778,11 @@ except Exception as e:
 # --------------------------------------------------
 try:
     from routes import auth_routes
-    print("✅ auth_routes imported successfully", file=sys.stderr)
+    logger.debug("✅ auth_routes imported successfully")
     app.include_router(
         auth_routes.router,
         prefix="/auth",
         tags=["Authentication"]
     )
 except Exception as e:
-    print("⚠️ AUTH ROUTE IMPORT FAILED:", e, file=sys.stderr)
-    traceback.print_exc()
+    logger.exception("⚠️ AUTH ROUTE IMPORT FAILED: %s", e)
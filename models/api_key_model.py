@@ -6,6 +6,19 @@ from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 
 
+def format_timestamp(dt) -> str:
+    """Format as MM-DD-YYYY HH:MM AM/PM without strftime's locale lookup."""
+    return (
+        f"{dt.month:02d}-{dt.day:02d}-{dt.year} "
+        f"{(dt.hour - 1) % 12 + 1:02d}:{dt.minute:02d} {'PM' if dt.hour >= 12 else 'AM'}"
+    )
+
+
+def mask_key_preview(head: str, tail: str, length: int) -> str:
+    """Mask a stored value from its first 8 chars, last 4 chars and length."""
+    return f"{head[:4]}...{tail}" if length > 8 else head
+
+
 class APIKey(Base):
     """Database model for storing encrypted API keys."""
     __tablename__ = "api_keys"
@@ -18,11 +31,11 @@ class APIKey(Base):
     def to_dict(self, mask: bool = True):
         """Return a dict representation, masking key for UI display."""
         masked_value = (
-            f"{self.key_value[:4]}...{self.key_value[-4:]}"
-            if mask and len(self.key_value) > 8 else self.key_value
+            mask_key_preview(self.key_value[:8], self.key_value[-4:], len(self.key_value))
+            if mask else self.key_value
         )
         return {
             "service_name": self.service_name,
             "key_preview": masked_value,
-            "updated_at": self.updated_at.strftime("%m-%d-%Y %I:%M %p") if self.updated_at else None,
+            "updated_at": format_timestamp(self.updated_at) if self.updated_at else None,
         }
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
@@ -6,7 +7,14 @@ from database import get_db, Base
 from sqlalchemy import Column, Integer, String
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use argon2id; existing bcrypt hashes still verify and are
+# upgraded on the next successful login.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__memory_cost=19456,
+    argon2__parallelism=2,
+)
 
 class User(Base):
     __tablename__ = "users"
@@ -18,9 +26,22 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+def _authenticate(db: Session, email: str, password: str):
+    """Look up and verify the user; runs in the threadpool since hashing is CPU-bound."""
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        return None
+    ok, new_hash = pwd_context.verify_and_update(password, user.password)
+    if not ok:
+        return None
+    if new_hash:
+        user.password = new_hash
+        db.commit()
+    return user
+
 @router.post("/login")
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user or not pwd_context.verify(request.password, user.password):
+async def login(request: LoginRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_authenticate, db, request.email, request.password)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return {"message": "Login successful", "user_id": user.id}
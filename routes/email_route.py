@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from services.email_service import send_recap_email
+from typing import List
+from services.email_service import send_recap_email, send_recap_email_batch
 
 router = APIRouter()
 
@@ -9,6 +10,9 @@ class RecapRequest(BaseModel):
     first_name: str
     recap_body: str
 
+class RecapBatchRequest(BaseModel):
+    recipients: List[RecapRequest]
+
 @router.post("/send-recap")
 def send_recap(request: RecapRequest):
     """
@@ -23,3 +27,16 @@ def send_recap(request: RecapRequest):
         return {"status": "success", "message": "Recap email sent successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/send-recap-batch")
+def send_recap_batch(request: RecapBatchRequest):
+    """
+    Send recap emails to several recipients in as few SendGrid calls as possible.
+    """
+    try:
+        sent = send_recap_email_batch(
+            (r.to_email, r.first_name, r.recap_body) for r in request.recipients
+        )
+        return {"status": "success", "message": f"{sent} recap emails sent successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
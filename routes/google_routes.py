@@ -1,76 +1,267 @@
 # --------------------------------------------------
 # routes/google_routes.py
 # --------------------------------------------------
-from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse
-from typing import Optional, List
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response
+from cachetools import TTLCache
+from typing import Annotated, Literal, Optional, List, get_args
+import logging
 import os
-import requests
-import sys
-import traceback
+from dataclasses import dataclass
+import numpy as np
+import orjson
 from utils.global_cache import google_auth_cache  # ✅ shared cache
+from utils.http_client import get_http_client  # ✅ shared async client
 
 router = APIRouter()
-print("✅ google_routes.py loaded successfully", file=sys.stderr)
+logger = logging.getLogger(__name__)
+logger.debug("✅ google_routes.py loaded successfully")
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+    logger.warning("⚠️ ijson not installed; Ads responses will be buffered before parsing")
+
 
 # Optional DB helper import
 try:
-    from routes.settings_routes import get_api_key
+    from routes.settings_routes import invalidate_google_tokens, load_google_tokens, update_or_create_key
 except Exception as e:
-    print(f"⚠️ Could not import settings helpers: {e}", file=sys.stderr)
+    logger.warning("⚠️ Could not import settings helpers: %s", e)
+
+
+# --------------------------------------------------
+# Request constants (resolved once at import)
+# --------------------------------------------------
+GOOGLE_ADS_API = "https://googleads.googleapis.com/v17/customers"
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
+GOOGLE_MCC_ID = os.getenv("GOOGLE_MCC_ID", "6207912456")
+GOOGLE_ADS_DEVELOPER_TOKEN = os.getenv("GOOGLE_ADS_DEVELOPER_TOKEN", "")
+if not GOOGLE_ADS_DEVELOPER_TOKEN:
+    logger.warning("⚠️ GOOGLE_ADS_DEVELOPER_TOKEN is not set; Google Ads calls will be rejected")
+
+_BASE_HEADERS = {
+    "developer-token": GOOGLE_ADS_DEVELOPER_TOKEN,
+    "login-customer-id": GOOGLE_MCC_ID,
+    "Content-Type": "application/json"
+}
+
+# Request bodies are serialized once here and sent as raw bytes
+_ACCOUNTS_QUERY_BODY = orjson.dumps({
+    "query": """
+        SELECT
+          customer_client.id,
+          customer_client.descriptive_name,
+          customer_client.status
+        FROM customer_client
+        WHERE customer_client.manager = FALSE
+    """
+})
+
+_ADS_QUERY = """
+    SELECT
+      customer.descriptive_name,
+      segments.date,
+      metrics.impressions,
+      metrics.clicks,
+      metrics.cost_micros,
+      metrics.conversions
+    FROM customer
+    WHERE segments.date DURING {date_range}
+    ORDER BY segments.date DESC
+"""
+# GAQL's predefined DURING ranges; anything else is rejected by validation
+DateRange = Literal[
+    "TODAY", "YESTERDAY", "LAST_7_DAYS", "LAST_14_DAYS", "LAST_30_DAYS",
+    "LAST_BUSINESS_WEEK", "THIS_WEEK_SUN_TODAY", "THIS_WEEK_MON_TODAY",
+    "LAST_WEEK_SUN_SAT", "LAST_WEEK_MON_SUN", "THIS_MONTH", "LAST_MONTH",
+]
+_ADS_QUERY_BODIES = {
+    date_range: orjson.dumps({"query": _ADS_QUERY.format(date_range=date_range)})
+    for date_range in get_args(DateRange)
+}
+
+
+def _auth_headers(access_token: str) -> dict:
+    return {"Authorization": f"Bearer {access_token}", **_BASE_HEADERS}
+
+
+async def _refresh_access_token(token: dict) -> Optional[dict]:
+    """Exchange the refresh token for a new access token and store it."""
+    refresh_token = token.get("refresh_token")
+    if not refresh_token:
+        return None
+    response = await get_http_client().post(GOOGLE_TOKEN_URL, data={
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+        "client_id": GOOGLE_CLIENT_ID,
+        "client_secret": GOOGLE_CLIENT_SECRET,
+    })
+    if response.status_code != 200:
+        logger.warning("⚠️ Google token refresh failed: %s", response.status_code)
+        return None
+    access_token = orjson.loads(response.content).get("access_token")
+    if not access_token:
+        return None
+
+    token = {**token, "access_token": access_token}
+    google_auth_cache["latest"] = token
+    try:
+        # Persists the token and drops this process's cached DB tokens only.
+        # Other workers keep their cached token (up to 55 min) and refresh on
+        # their own 401.
+        await run_in_threadpool(update_or_create_key, "google_ads_access", access_token)
+    except Exception:
+        logger.exception("⚠️ Failed to persist refreshed Google access token")
+    return token
+
+
+class _AsyncByteReader:
+    """Expose an httpx byte stream through the async read() ijson expects."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        while not self._buffer:
+            try:
+                self._buffer = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+ADS_RECORD_LIMIT = 25  # default number of records returned
+
+# Serialized ads_summary bodies by query parameters. Dashboards poll the same
+# few ranges, and a few minutes of staleness is fine for ad metrics.
+_ads_summary_cache = TTLCache(maxsize=256, ttl=int(os.getenv("ADS_SUMMARY_CACHE_TTL", "300")))
+_ADS_BATCH_ROWS = 4096
+
+
+class _AdsAggregate:
+    """Running totals over searchStream rows plus the first `keep` rows.
+
+    Rows are buffered in fixed-size batches and each batch is reduced with
+    NumPy, so memory stays bounded however long the report is.
+    """
+
+    def __init__(self, keep: int):
+        self.keep = keep
+        self.totals = np.zeros(4)  # impressions, clicks, spend_usd, conversions
+        self.head_dates: List[str] = []
+        self._head: List[np.ndarray] = []
+        self._dates: List[str] = []
+        self._columns = ([], [], [], [])
+
+    def add(self, row: dict):
+        metrics = row.get("metrics", {})
+        impressions, clicks, cost_micros, conversions = self._columns
+        self._dates.append(row.get("segments", {}).get("date"))
+        impressions.append(metrics.get("impressions", 0))
+        clicks.append(metrics.get("clicks", 0))
+        cost_micros.append(metrics.get("cost_micros", 0))
+        conversions.append(metrics.get("conversions", 0))
+        if len(self._dates) >= _ADS_BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self._dates:
+            return
+        impressions, clicks, cost_micros, conversions = self._columns
+        spend_usd = np.round(np.array(cost_micros, dtype=np.int64) / 1_000_000, 2)
+        batch = np.stack((
+            np.array(impressions, dtype=np.int64),
+            np.array(clicks, dtype=np.int64),
+            spend_usd,
+            np.array(conversions, dtype=np.float64),
+        ))
+        # One reduction over the stacked metric rows for all four totals
+        self.totals += np.add.reduce(batch, axis=1)
+
+        need = self.keep - len(self.head_dates)
+        if need > 0:
+            self.head_dates.extend(self._dates[:need])
+            self._head.append(batch[:, :need])
+
+        self._dates = []
+        self._columns = ([], [], [], [])
+
+    def head(self) -> np.ndarray:
+        """The kept rows as a 4 x n array in the same column order as totals."""
+        return np.concatenate(self._head, axis=1) if self._head else np.zeros((4, 0))
+
+
+def _masked_ratio(numerator: np.ndarray, denominator: np.ndarray, scale: float = 1) -> np.ndarray:
+    """numerator / denominator * scale rounded to 2 places, 0 where the denominator is 0."""
+    out = np.zeros(len(denominator))
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    if scale != 1:
+        out *= scale
+    return np.round(out, 2, out=out)
+
+
+async def _aggregate_ads_rows(response, keep: int) -> _AdsAggregate:
+    """Aggregate a searchStream response as it is read.
+
+    With ijson the rows are parsed as the body arrives, so neither the raw
+    body nor its parsed tree is ever held in full.
+    """
+    aggregate = _AdsAggregate(keep)
+    if ijson is not None:
+        rows = ijson.items_async(_AsyncByteReader(response.aiter_bytes()), "item.results.item", use_float=True)
+        async for row in rows:
+            aggregate.add(row)
+    else:
+        await response.aread()
+        for chunk in orjson.loads(response.content):
+            for row in chunk.get("results", []):
+                aggregate.add(row)
+    aggregate.flush()
+    return aggregate
 
 
 # ==================================================
 # 🔹 1. List all client accounts under your MCC
 # ==================================================
 @router.get("/google/accounts")
-def list_google_accounts():
+async def list_google_accounts():
     """List client (non-manager) accounts accessible under the MCC."""
-    if "latest" not in google_auth_cache:
-        return JSONResponse(
+    token = google_auth_cache.get("latest")
+    if not token:
+        return ORJSONResponse(
             status_code=401,
             content={"error": "No Google tokens found. Please authorize first at /auth/login."}
         )
 
-    token = google_auth_cache["latest"]
     access_token = token.get("access_token")
     if not access_token:
-        return JSONResponse(status_code=401, content={"error": "Access token missing or invalid."})
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "developer-token": os.getenv("GOOGLE_ADS_DEVELOPER_TOKEN"),
-        "login-customer-id": os.getenv("GOOGLE_MCC_ID", "6207912456"),
-        "Content-Type": "application/json"
-    }
-
-    query = {
-        "query": """
-            SELECT
-              customer_client.id,
-              customer_client.descriptive_name,
-              customer_client.status
-            FROM customer_client
-            WHERE customer_client.manager = FALSE
-        """
-    }
+        return ORJSONResponse(status_code=401, content={"error": "Access token missing or invalid."})
 
-    url = f"https://googleads.googleapis.com/v17/customers/{os.getenv('GOOGLE_MCC_ID', '6207912456')}/googleAds:searchStream"
+    url = f"{GOOGLE_ADS_API}/{GOOGLE_MCC_ID}/googleAds:searchStream"
 
     try:
-        response = requests.post(url, headers=headers, json=query)
+        response = await get_http_client().post(url, headers=_auth_headers(access_token), content=_ACCOUNTS_QUERY_BODY)
     except Exception as e:
-        traceback.print_exc()
-        return JSONResponse(status_code=500, content={"error": f"Request failed: {str(e)}"})
+        logger.exception("Google Ads request failed")
+        return ORJSONResponse(status_code=500, content={"error": f"Request failed: {str(e)}"})
 
     if response.status_code != 200:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=response.status_code,
             content={"error": "Failed to fetch client accounts", "details": response.text}
         )
 
     clients = []
-    for chunk in response.json():
+    for chunk in orjson.loads(response.content):
         for row in chunk.get("results", []):
             client = row.get("customerClient", {})
             clients.append({
@@ -85,110 +276,111 @@ def list_google_accounts():
 # ==================================================
 # 🔹 2. Google Ads Summary Endpoint (per client)
 # ==================================================
+@dataclass
+class AdsSummaryParams:
+    """Query parameters for /google/ads_summary, validated in one model."""
+    # A dataclass keeps these Query() annotations in its __init__ signature,
+    # which Depends() reads, so the descriptions reach OpenAPI. A pydantic
+    # model's signature drops them.
+    customer_id: Annotated[str, Query(description="Client Customer ID (not MCC)")]
+    date_range: Annotated[DateRange, Query(description="Date range for report")] = "LAST_7_DAYS"
+    ad_spend: Annotated[Optional[float], Query(description="Ad spend for ROI calculation")] = None
+    total_revenue: Annotated[Optional[float], Query(description="Total revenue from ads")] = None
+    limit: Annotated[int, Query(ge=0, le=1000, description="Number of daily records to return")] = ADS_RECORD_LIMIT
+
+
 @router.get("/google/ads_summary")
-def get_ads_summary(
-    customer_id: str = Query(..., description="Client Customer ID (not MCC)"),
-    date_range: str = Query("LAST_7_DAYS", description="Date range for report"),
-    ad_spend: Optional[float] = Query(None, description="Ad spend for ROI calculation"),
-    total_revenue: Optional[float] = Query(None, description="Total revenue from ads")
-):
+async def get_ads_summary(params: AdsSummaryParams = Depends()):
     """Retrieve campaign performance metrics for a client account."""
+    customer_id = params.customer_id
+    date_range = params.date_range
+    ad_spend = params.ad_spend
+    total_revenue = params.total_revenue
     token = google_auth_cache.get("latest")
 
     # Try DB fallback if memory cache is empty
     if not token:
         try:
-            refresh_token = get_api_key("google_ads_refresh")
-            access_token = get_api_key("google_ads_access")
-            if refresh_token and access_token:
-                token = {"access_token": access_token, "refresh_token": refresh_token}
+            token = await run_in_threadpool(load_google_tokens)
+            if token:
                 google_auth_cache["latest"] = token
             else:
-                return JSONResponse(status_code=401, content={"error": "No Google tokens found. Please authorize first at /auth/login."})
+                return ORJSONResponse(status_code=401, content={"error": "No Google tokens found. Please authorize first at /auth/login."})
         except Exception as e:
-            print(f"⚠️  Error retrieving tokens from DB: {e}", file=sys.stderr)
-            return JSONResponse(status_code=500, content={"error": "Failed to load Google tokens from database."})
+            logger.exception("⚠️  Error retrieving tokens from DB")
+            return ORJSONResponse(status_code=500, content={"error": "Failed to load Google tokens from database."})
 
     access_token = token.get("access_token")
     if not access_token:
-        return JSONResponse(status_code=401, content={"error": "Access token missing or invalid."})
+        return ORJSONResponse(status_code=401, content={"error": "Access token missing or invalid."})
+
+    cache_key = (customer_id, date_range, ad_spend, total_revenue, params.limit)
+    cached_body = _ads_summary_cache.get(cache_key)
+    if cached_body is not None:
+        return Response(content=cached_body, media_type="application/json")
 
     # --------------------------------------------------
     # Step 2: Prepare API request
     # --------------------------------------------------
-    login_customer_id = os.getenv("GOOGLE_MCC_ID", "6207912456")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "developer-token": os.getenv("GOOGLE_ADS_DEVELOPER_TOKEN"),
-        "login-customer-id": login_customer_id,
-        "Content-Type": "application/json"
-    }
-
-    query = {
-        "query": f"""
-            SELECT
-              customer.descriptive_name,
-              segments.date,
-              metrics.impressions,
-              metrics.clicks,
-              metrics.cost_micros,
-              metrics.conversions
-            FROM customer
-            WHERE segments.date DURING {date_range}
-            ORDER BY segments.date DESC
-        """
-    }
-
-    url = f"https://googleads.googleapis.com/v17/customers/{customer_id}/googleAds:searchStream"
+    body = _ADS_QUERY_BODIES[date_range]
+    url = f"{GOOGLE_ADS_API}/{customer_id}/googleAds:searchStream"
 
     try:
-        response = requests.post(url, headers=headers, json=query)
+        # A rejected access token is refreshed once and the request retried
+        for attempt in range(2):
+            async with get_http_client().stream("POST", url, headers=_auth_headers(access_token), content=body) as response:
+                if response.status_code == 401 and attempt == 0:
+                    google_auth_cache.pop("latest", None)
+                    await run_in_threadpool(invalidate_google_tokens)
+                    token = await _refresh_access_token(token)
+                    if token:
+                        access_token = token["access_token"]
+                        continue
+                if response.status_code != 200:
+                    await response.aread()
+                    return ORJSONResponse(
+                        status_code=response.status_code,
+                        content={"error": "Failed to retrieve Ads data.", "details": response.text}
+                    )
+                aggregate = await _aggregate_ads_rows(response, params.limit)
+                break
     except Exception as e:
-        traceback.print_exc()
-        return JSONResponse(status_code=500, content={"error": f"Request failed: {str(e)}"})
+        logger.exception("Google Ads request failed")
+        return ORJSONResponse(status_code=500, content={"error": f"Request failed: {str(e)}"})
 
-    if response.status_code != 200:
-        return JSONResponse(
-            status_code=response.status_code,
-            content={"error": "Failed to retrieve Ads data.", "details": response.text}
-        )
+    # Derive the per-row ratios for the returned rows with whole-array
+    # operations instead of per-row Python math.
+    head = aggregate.head()
+    impressions = head[0].astype(np.int64)
+    clicks = head[1].astype(np.int64)
+    spend_usd = head[2]
+    conversions = head[3]
+    ctr = _masked_ratio(clicks, impressions, 100)
+    cpc = _masked_ratio(spend_usd, clicks)
+    cpm = _masked_ratio(spend_usd, impressions, 1000)
 
-    data = response.json()
-    results: List[dict] = []
-    total_impressions = 0
-    total_clicks = 0
-    total_cost = 0
-    total_conversions = 0
+    results: List[dict] = [
+        {
+            "date": date,
+            "impressions": row_impressions,
+            "clicks": row_clicks,
+            "ctr": row_ctr,
+            "cpc": row_cpc,
+            "cpm": row_cpm,
+            "conversions": row_conversions,
+            "spend_usd": row_spend
+        }
+        for date, row_impressions, row_clicks, row_ctr, row_cpc, row_cpm, row_conversions, row_spend in zip(
+            aggregate.head_dates, impressions.tolist(), clicks.tolist(), ctr.tolist(), cpc.tolist(),
+            cpm.tolist(), conversions.tolist(), spend_usd.tolist()
+        )
+    ]
 
-    for chunk in data:
-        for row in chunk.get("results", []):
-            impressions = row["metrics"].get("impressions", 0)
-            clicks = row["metrics"].get("clicks", 0)
-            cost_micros = row["metrics"].get("cost_micros", 0)
-            conversions = row["metrics"].get("conversions", 0)
-            spend_usd = round(cost_micros / 1_000_000, 2)
-            date = row["segments"].get("date")
-
-            ctr = round((clicks / impressions) * 100, 2) if impressions else 0
-            cpc = round((spend_usd / clicks), 2) if clicks else 0
-            cpm = round((spend_usd / impressions * 1000), 2) if impressions else 0
-
-            total_impressions += impressions
-            total_clicks += clicks
-            total_cost += spend_usd
-            total_conversions += conversions
-
-            results.append({
-                "date": date,
-                "impressions": impressions,
-                "clicks": clicks,
-                "ctr": ctr,
-                "cpc": cpc,
-                "cpm": cpm,
-                "conversions": conversions,
-                "spend_usd": spend_usd
-            })
+    totals = aggregate.totals
+    total_impressions = int(totals[0])
+    total_clicks = int(totals[1])
+    total_cost = float(totals[2])
+    total_conversions = float(totals[3])
 
     total_ctr = round((total_clicks / total_impressions) * 100, 2) if total_impressions else 0
     total_cpc = round((total_cost / total_clicks), 2) if total_clicks else 0
@@ -206,12 +398,12 @@ def get_ads_summary(
         "roas": total_roas
     }
 
-    return JSONResponse(
+    summary_response = ORJSONResponse(
         status_code=200,
         content={
             "status": "success",
             "summary": summary,
-            "records": results[:25],
+            "records": results,
             "meta": {
                 "customer_id": customer_id,
                 "date_range": date_range,
@@ -220,3 +412,5 @@ def get_ads_summary(
             }
         }
     )
+    _ads_summary_cache[cache_key] = summary_response.body
+    return summary_response
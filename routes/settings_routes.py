@@ -1,16 +1,23 @@
 # routes/settings_routes.py
 
-print("🟢 settings_routes module starting up...", flush=True)
+import logging
+
+logger = logging.getLogger(__name__)
+logger.debug("🟢 settings_routes module starting up...")
 
 from fastapi import APIRouter, Depends, HTTPException
+from cachetools import TTLCache
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from services.settings_service import SettingsService
+from utils.encryption import DECRYPTION_FAILED
 from models.api_key_model import Base
+from typing import Optional
 import os  # ✅ Required for DATABASE_URL
+import threading
 
 router = APIRouter()
-print("🟢 router initialized successfully", flush=True)
+logger.debug("🟢 router initialized successfully")
 
 # --------------------------------------------------
 # Database Setup
@@ -19,11 +26,23 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in environment variables.")
 
-engine = create_engine(DATABASE_URL)
+# pre_ping replaces connections the server dropped instead of failing the
+# request; recycle stays under typical managed-Postgres idle timeouts. Pool
+# size is per worker, so keep workers x (size + overflow) under the server's
+# connection limit.
+_pool_options = {"pool_pre_ping": True, "pool_recycle": 1800}
+if not DATABASE_URL.startswith("sqlite"):
+    _pool_options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    )
+engine = create_engine(DATABASE_URL, **_pool_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create table if it doesn’t exist
-Base.metadata.create_all(bind=engine)
+# Tables are created once per deploy by scripts/init_db.py rather than by
+# every worker at import; RUN_MIGRATIONS=1 restores the old behaviour.
+if os.getenv("RUN_MIGRATIONS"):
+    Base.metadata.create_all(bind=engine)
 
 def get_db():
     """Dependency that provides a DB session."""
@@ -33,6 +52,57 @@ def get_db():
     finally:
         db.close()
 
+# --------------------------------------------------
+# Helpers for other modules (run outside a request-scoped session)
+# --------------------------------------------------
+GOOGLE_TOKEN_KEYS = ("google_ads_access", "google_ads_refresh")
+
+# Just under the one-hour access token lifetime
+_google_tokens_cache = TTLCache(maxsize=4, ttl=3300)
+_google_tokens_lock = threading.Lock()
+
+
+def update_or_create_key(service_name: str, api_key: str):
+    """Store a key from outside a request (e.g. the OAuth callback)."""
+    db = SessionLocal()
+    try:
+        result = SettingsService(db).add_or_update_key(service_name, api_key)
+    finally:
+        db.close()
+    _invalidate_if_google(service_name)
+    return result
+
+
+def load_google_tokens() -> Optional[dict]:
+    """Return the stored Google tokens, loading both in one query and caching them."""
+    with _google_tokens_lock:
+        token = _google_tokens_cache.get("google")
+        if token is None:
+            db = SessionLocal()
+            try:
+                keys = SettingsService(db).get_decrypted_keys(GOOGLE_TOKEN_KEYS)
+            finally:
+                db.close()
+            access_token = keys.get("google_ads_access")
+            refresh_token = keys.get("google_ads_refresh")
+            # Keys that no longer decrypt (e.g. after a key rotation) count as missing
+            if DECRYPTION_FAILED in (access_token, refresh_token) or not (access_token and refresh_token):
+                return None
+            token = {"access_token": access_token, "refresh_token": refresh_token}
+            _google_tokens_cache["google"] = token
+        return token
+
+
+def invalidate_google_tokens():
+    """Drop cached Google tokens, e.g. after Google rejects the access token."""
+    with _google_tokens_lock:
+        _google_tokens_cache.clear()
+
+
+def _invalidate_if_google(service_name: str):
+    if service_name in GOOGLE_TOKEN_KEYS:
+        invalidate_google_tokens()
+
 # --------------------------------------------------
 # Routes
 # --------------------------------------------------
@@ -56,13 +126,17 @@ def get_single_key(service_name: str, db: Session = Depends(get_db)):
 def update_key(service_name: str, key_value: str, db: Session = Depends(get_db)):
     """Add or update an API key."""
     service = SettingsService(db)
-    return service.add_or_update_key(service_name, key_value)
+    result = service.add_or_update_key(service_name, key_value)
+    _invalidate_if_google(service_name)
+    return result
 
 @router.delete("/delete/{service_name}")
 def delete_key(service_name: str, db: Session = Depends(get_db)):
     """Delete an API key."""
     service = SettingsService(db)
-    return service.delete_key(service_name)
+    result = service.delete_key(service_name)
+    _invalidate_if_google(service_name)
+    return result
 
 @router.post("/test/{service_name}")
 def test_key(service_name: str, db: Session = Depends(get_db)):
@@ -0,0 +1,27 @@
+# --------------------------------------------------
+# scripts/init_db.py
+# --------------------------------------------------
+# Create missing tables once per deploy, before the app workers start:
+#   python -m scripts.init_db
+# Failures are logged, not fatal: like main.py, which serves every other
+# route when settings can't load, the app should still start without a DB.
+import logging
+
+logger = logging.getLogger("scripts.init_db")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        from models.api_key_model import Base
+        from routes.settings_routes import engine
+
+        Base.metadata.create_all(bind=engine)
+    except Exception as e:
+        logger.exception("⚠️ Database init skipped: %s", e)
+        return
+    logger.info("✅ Database tables are up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,112 @@
 import os
+import string
 import requests
 
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 FROM_EMAIL = os.getenv("FROM_EMAIL")
 FROM_NAME = os.getenv("FROM_NAME", "Papillon House Bookkeeping")
+# When set, SendGrid renders the recap from this dynamic template and only
+# the personalization fields are sent; otherwise the local HTML is used.
+SENDGRID_TEMPLATE_ID = os.getenv("SENDGRID_TEMPLATE_ID")
+RECAP_SUBJECT = "Your Papillon House Consultation Recap"
+# SendGrid accepts at most 1000 personalizations per /mail/send request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
 
 TEMPLATE_PATH = "utils/email_templates/chatbot_recap_template.html"
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+
+
+def _load_template(path: str) -> string.Template:
+    """Read the HTML template once, turning {{placeholders}} into $placeholders."""
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read().replace("$", "$$")
+    return string.Template(
+        html.replace("{{first_name}}", "${first_name}").replace("{{recap_body}}", "${recap_body}")
+    )
+
+
+_TEMPLATE = _load_template(TEMPLATE_PATH)
+
+# One keep-alive session so repeated sends reuse the TLS connection
+_sg = requests.Session()
+_sg.headers.update({
+    "Authorization": f"Bearer {SENDGRID_API_KEY}",
+    "Content-Type": "application/json",
+})
+
+
+def _recap_personalization(to_email: str, first_name: str, recap_body: str) -> dict:
+    return {
+        "to": [{"email": to_email}],
+        "dynamic_template_data": {
+            "subject": RECAP_SUBJECT,
+            "first_name": first_name,
+            "recap_body": recap_body,
+        },
+    }
+
+
+def _post_mail(data: dict):
+    response = _sg.post(SENDGRID_URL, json=data)
+    if response.status_code not in (200, 202):
+        raise Exception(f"SendGrid error {response.status_code}: {response.text}")
 
 
 def send_recap_email(to_email: str, first_name: str, recap_body: str):
-    """Send recap email via SendGrid using the HTML template."""
+    """Send recap email via SendGrid using the dynamic or local HTML template."""
     if not SENDGRID_API_KEY:
         raise ValueError("SENDGRID_API_KEY not set")
 
-    # Load HTML template
-    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
-        html_template = f.read()
+    if SENDGRID_TEMPLATE_ID:
+        data = {
+            "personalizations": [_recap_personalization(to_email, first_name, recap_body)],
+            "from": {"email": FROM_EMAIL, "name": FROM_NAME},
+            "template_id": SENDGRID_TEMPLATE_ID,
+        }
+        _post_mail(data)
+        return True
 
-    # Replace placeholders
-    html_body = (
-        html_template.replace("{{first_name}}", first_name)
-        .replace("{{recap_body}}", recap_body)
-    )
+    html_body = _TEMPLATE.substitute(first_name=first_name, recap_body=recap_body)
 
     # Fallback plain text
     text_body = f"Hi {first_name},\n\n{recap_body}\n\n– Papillon House Bookkeeping"
 
     # Prepare SendGrid request
-    url = "https://api.sendgrid.com/v3/mail/send"
-    headers = {
-        "Authorization": f"Bearer {SENDGRID_API_KEY}",
-        "Content-Type": "application/json",
-    }
     data = {
         "personalizations": [{"to": [{"email": to_email}]}],
         "from": {"email": FROM_EMAIL, "name": FROM_NAME},
-        "subject": "Your Papillon House Consultation Recap",
+        "subject": RECAP_SUBJECT,
         "content": [
             {"type": "text/plain", "value": text_body},
             {"type": "text/html", "value": html_body},
         ],
     }
 
-    response = requests.post(url, headers=headers, json=data)
-    if response.status_code not in (200, 202):
-        raise Exception(f"SendGrid error {response.status_code}: {response.text}")
-
+    _post_mail(data)
     return True
 
+
+def send_recap_email_batch(recipients):
+    """Send recaps to many recipients, given (to_email, first_name, recap_body) tuples.
+
+    With a dynamic template, recipients are sent as personalizations of a
+    single request per 1000 recipients; otherwise each recap is sent on its
+    own over the shared session. Returns the number of recaps sent.
+    """
+    if not SENDGRID_API_KEY:
+        raise ValueError("SENDGRID_API_KEY not set")
+
+    recipients = list(recipients)
+    if not SENDGRID_TEMPLATE_ID:
+        for to_email, first_name, recap_body in recipients:
+            send_recap_email(to_email, first_name, recap_body)
+        return len(recipients)
+
+    for start in range(0, len(recipients), SENDGRID_MAX_PERSONALIZATIONS):
+        shard = recipients[start:start + SENDGRID_MAX_PERSONALIZATIONS]
+        _post_mail({
+            "personalizations": [_recap_personalization(*recipient) for recipient in shard],
+            "from": {"email": FROM_EMAIL, "name": FROM_NAME},
+            "template_id": SENDGRID_TEMPLATE_ID,
+        })
+    return len(recipients)
@@ -1,12 +1,18 @@
 # services/settings_service.py
 
 from sqlalchemy.orm import Session
-from models.api_key_model import APIKey
-from utils.encryption import encryption_manager
+from cachetools import TTLCache
+from sqlalchemy import func
+from models.api_key_model import APIKey, format_timestamp, mask_key_preview
+from utils.encryption import DECRYPTION_FAILED, encryption_manager
 from datetime import datetime
+import threading
 
-# In-memory cache for quick access
-global_settings_cache = {}
+# Decrypted key values by service name. Keys stay encrypted in the DB; this
+# saves a query and a decrypt per lookup. The TTL bounds how long another
+# worker's update can go unseen.
+global_settings_cache = TTLCache(maxsize=256, ttl=600)
+_cache_lock = threading.Lock()
 
 
 class SettingsService:
@@ -16,9 +22,27 @@ class SettingsService:
         self.db = db
 
     def get_all_keys(self):
-        """Retrieve all stored API keys (masked)."""
-        keys = self.db.query(APIKey).all()
-        return [key.to_dict() for key in keys]
+        """Retrieve all stored API keys (masked).
+
+        Only the characters the preview shows are fetched, not the full
+        encrypted values.
+        """
+        length = func.length(APIKey.key_value)
+        rows = self.db.query(
+            APIKey.service_name,
+            APIKey.updated_at,
+            func.substr(APIKey.key_value, 1, 8),
+            func.substr(APIKey.key_value, length - 3, 4),
+            length,
+        ).all()
+        return [
+            {
+                "service_name": service_name,
+                "key_preview": mask_key_preview(head, tail, key_length),
+                "updated_at": format_timestamp(updated_at) if updated_at else None,
+            }
+            for service_name, updated_at, head, tail, key_length in rows
+        ]
 
     def get_key(self, service_name: str):
         """Retrieve one API key (masked)."""
@@ -27,6 +51,31 @@ class SettingsService:
             return None
         return key.to_dict()
 
+    def get_decrypted_keys(self, service_names):
+        """Fetch and decrypt several keys, serving cached values first; missing services are omitted."""
+        found = {}
+        with _cache_lock:
+            for name in service_names:
+                value = global_settings_cache.get(name)
+                if value is not None:
+                    found[name] = value
+        missing = [name for name in service_names if name not in found]
+        if not missing:
+            return found
+
+        rows = (
+            self.db.query(APIKey.service_name, APIKey.key_value)
+            .filter(APIKey.service_name.in_(missing))
+            .all()
+        )
+        for name, value in rows:
+            decrypted = encryption_manager.decrypt(value)
+            found[name] = decrypted
+            if decrypted != DECRYPTION_FAILED:
+                with _cache_lock:
+                    global_settings_cache[name] = decrypted
+        return found
+
     def add_or_update_key(self, service_name: str, key_value: str):
         """Add a new key or update an existing one."""
         encrypted_value = encryption_manager.encrypt(key_value)
@@ -40,10 +89,10 @@ class SettingsService:
             self.db.add(new_key)
 
         self.db.commit()
-        self.db.refresh(existing if existing else new_key)
 
         # Update in-memory cache
-        global_settings_cache[service_name] = key_value
+        with _cache_lock:
+            global_settings_cache[service_name] = key_value
         return {"status": "success", "message": f"API key for {service_name} updated successfully."}
 
     def delete_key(self, service_name: str):
@@ -54,18 +103,18 @@ class SettingsService:
 
         self.db.delete(key)
         self.db.commit()
-        global_settings_cache.pop(service_name, None)
+        with _cache_lock:
+            global_settings_cache.pop(service_name, None)
         return {"status": "success", "message": f"{service_name} key deleted."}
 
     def test_key(self, service_name: str):
         """Stub method for testing API key validity."""
         # Placeholder: you can extend this later to ping real APIs.
-        key = self.db.query(APIKey).filter(APIKey.service_name == service_name).first()
-        if not key:
+        decrypted = self.get_decrypted_keys([service_name]).get(service_name)
+        if decrypted is None:
             return {"status": "error", "message": f"No key found for {service_name}."}
 
-        decrypted = encryption_manager.decrypt(key.key_value)
-        is_valid = bool(decrypted)
+        is_valid = bool(decrypted) and decrypted != DECRYPTION_FAILED
         return {
             "status": "valid" if is_valid else "invalid",
             "message": f"{service_name} key {'appears valid' if is_valid else 'failed validation'}."
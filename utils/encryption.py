@@ -1,6 +1,17 @@
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+import base64
 import os
 
+DECRYPTION_FAILED = "[decryption failed]"
+
+# Values written by encrypt() carry this prefix; anything else is a legacy
+# Fernet token (those always start with "gAAAAA").
+_GCM_PREFIX = "v2:"
+_NONCE_SIZE = 12
+
 
 class EncryptionManager:
     """Handles encryption and decryption of sensitive values."""
@@ -9,24 +20,34 @@ class EncryptionManager:
         secret_key = os.getenv("SECRET_ENCRYPTION_KEY")
         if not secret_key:
             raise ValueError("Missing SECRET_ENCRYPTION_KEY environment variable.")
-        self.fernet = Fernet(secret_key.encode() if isinstance(secret_key, str) else secret_key)
+        secret_key = secret_key.encode() if isinstance(secret_key, str) else secret_key
+        self.fernet = Fernet(secret_key)
+        # AES-256-GCM key derived from the same secret, so no new setting is needed
+        gcm_key = HKDF(
+            algorithm=hashes.SHA256(), length=32, salt=None, info=b"sparkdata-aes-gcm"
+        ).derive(base64.urlsafe_b64decode(secret_key))
+        self.aesgcm = AESGCM(gcm_key)
 
     def encrypt(self, plain_text: str) -> str:
         """Encrypt plain text into a secure string."""
         if not plain_text:
             return plain_text
-        return self.fernet.encrypt(plain_text.encode()).decode()
+        nonce = os.urandom(_NONCE_SIZE)
+        blob = nonce + self.aesgcm.encrypt(nonce, plain_text.encode(), None)
+        return _GCM_PREFIX + base64.urlsafe_b64encode(blob).decode()
 
     def decrypt(self, encrypted_text: str) -> str:
-        """Decrypt an encrypted string."""
+        """Decrypt an encrypted string (AES-GCM, or Fernet for older values)."""
         if not encrypted_text:
             return encrypted_text
         try:
+            if encrypted_text.startswith(_GCM_PREFIX):
+                blob = base64.urlsafe_b64decode(encrypted_text[len(_GCM_PREFIX):])
+                return self.aesgcm.decrypt(blob[:_NONCE_SIZE], blob[_NONCE_SIZE:], None).decode()
             return self.fernet.decrypt(encrypted_text.encode()).decode()
         except Exception:
-            return "[decryption failed]"
+            return DECRYPTION_FAILED
 
 
 # Singleton instance (can be imported anywhere)
 encryption_manager = EncryptionManager()
-
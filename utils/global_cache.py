@@ -2,7 +2,166 @@
 # utils/global_cache.py
 # --------------------------------------------------
 # Shared in-memory caches used by multiple routes
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
 
-uploaded_data_cache = {}
-google_auth_cache = {}
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+from cachetools import TTLCache
 
+
+logger = logging.getLogger(__name__)
+
+ROI_COLUMNS = frozenset({"email", "revenue"})
+
+
+@dataclass(frozen=True)
+class CachedUpload:
+    """An uploaded dataset (as an Arrow table) plus aggregates computed once at upload time."""
+    table: pa.Table
+    row_count: int
+    columns: List[str]
+    total_revenue: Optional[float]
+    has_roi_columns: bool
+
+    @classmethod
+    def from_table(cls, table: pa.Table) -> "CachedUpload":
+        total_revenue = None
+        if "revenue" in table.column_names:
+            try:
+                total_revenue = float(pc.sum(table["revenue"]).as_py() or 0.0)
+            except (pa.ArrowNotImplementedError, TypeError):
+                pass  # Non-numeric revenue; analyze_roi reports it
+        return cls(
+            table=table,
+            row_count=table.num_rows,
+            columns=table.column_names,
+            total_revenue=total_revenue,
+            has_roi_columns=ROI_COLUMNS <= frozenset(table.column_names),
+        )
+
+
+class _LockedTTLCache(TTLCache):
+    """TTLCache whose item access is serialized; sync handlers run on several threads."""
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        with self._lock:
+            super().__delitem__(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            return super().__contains__(key)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return super().get(key, default)
+
+    def pop(self, key, *args):
+        with self._lock:
+            return super().pop(key, *args)
+
+
+# Uploads are dropped an hour after they were made so a large dataset does
+# not stay pinned for the life of the process.
+UPLOAD_CACHE_TTL = int(os.getenv("UPLOAD_CACHE_TTL", "3600"))
+uploaded_data_cache = TTLCache(maxsize=4, ttl=UPLOAD_CACHE_TTL)
+# Google access tokens are valid for an hour
+google_auth_cache = _LockedTTLCache(maxsize=16, ttl=3600)
+
+# --------------------------------------------------
+# Shared upload store
+# --------------------------------------------------
+# Each uvicorn worker has its own caches above, so the latest upload is also
+# published as an Arrow IPC file (on tmpfs when available). Every worker
+# memory-maps it, and uploaded_data_cache only memoizes the mapped copy
+# together with the file mtime it was read at.
+UPLOAD_STORE_PATH = os.getenv(
+    "UPLOAD_STORE_PATH",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                 "sparkdata_latest.arrow"),
+)
+_META_KEY = b"sparkdata"
+_upload_lock = threading.Lock()
+
+
+def store_upload(upload: CachedUpload):
+    """Make an upload the latest one for this and every other worker.
+
+    Raises if the shared store can't be written; the previous upload then
+    stays the latest everywhere, so workers never disagree.
+    """
+    meta = {
+        "row_count": upload.row_count,
+        "columns": upload.columns,
+        "total_revenue": upload.total_revenue,
+    }
+    tmp_path = f"{UPLOAD_STORE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with _upload_lock:
+        try:
+            table = upload.table.replace_schema_metadata(
+                {**(upload.table.schema.metadata or {}), _META_KEY: orjson.dumps(meta)}
+            )
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            # Read before the rename (which keeps it): another worker may
+            # replace the store right after, and its mtime isn't ours.
+            mtime = os.stat(tmp_path).st_mtime_ns
+            os.replace(tmp_path, UPLOAD_STORE_PATH)
+        except Exception as e:
+            logger.warning("⚠️ Failed to publish upload to shared store %s: %s", UPLOAD_STORE_PATH, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        uploaded_data_cache["latest"] = (upload, mtime)
+
+
+def load_upload() -> Optional[CachedUpload]:
+    """Return the latest upload, mapping the shared store if it changed.
+
+    Returns None once the latest upload is older than UPLOAD_CACHE_TTL.
+    """
+    with _upload_lock:
+        return _load_upload_locked()
+
+
+def _load_upload_locked() -> Optional[CachedUpload]:
+    cached = uploaded_data_cache.get("latest")
+    try:
+        mtime = os.stat(UPLOAD_STORE_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if cached and cached[1] == mtime:
+        return cached[0]
+    if time.time_ns() - mtime > UPLOAD_CACHE_TTL * 1_000_000_000:
+        return None  # Left for the next upload to overwrite
+
+    table = feather.read_table(UPLOAD_STORE_PATH, memory_map=True)
+    meta = orjson.loads(table.schema.metadata[_META_KEY])
+    upload = CachedUpload(
+        table=table,
+        row_count=meta["row_count"],
+        columns=meta["columns"],
+        total_revenue=meta["total_revenue"],
+        has_roi_columns=ROI_COLUMNS <= frozenset(meta["columns"]),
+    )
+    uploaded_data_cache["latest"] = (upload, mtime)
+    return upload
@@ -0,0 +1,44 @@
+# --------------------------------------------------
+# utils/http_client.py
+# --------------------------------------------------
+# Shared async HTTP client for outbound API calls. Reusing one client keeps
+# upstream connections alive; main.py's lifespan opens and closes it.
+import importlib.util
+import logging
+from typing import Optional
+
+import httpx
+
+# HTTP/2 lets concurrent Google Ads calls share one connection; it needs the
+# optional h2 package (httpx[http2]).
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+if not HTTP2_ENABLED:
+    logging.getLogger(__name__).warning("⚠️ h2 not installed; outbound calls will use HTTP/1.1")
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def open_http_client() -> httpx.AsyncClient:
+    """Create the shared client (on app startup)."""
+    global _client
+    _client = httpx.AsyncClient(
+        http2=HTTP2_ENABLED,
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (on app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client; only valid while the app is running."""
+    if _client is None:
+        raise RuntimeError("HTTP client is not open; it is created by the app lifespan")
+    return _client
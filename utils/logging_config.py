@@ -0,0 +1,53 @@
+# --------------------------------------------------
+# utils/logging_config.py
+# --------------------------------------------------
+# Request handlers log through a QueueHandler; a listener thread does the
+# blocking stderr writes off the request path. Formatting (tracebacks
+# included) still happens in the calling thread, in QueueHandler.prepare().
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+_listener = None
+_queue_handler = None
+
+
+def setup_logging(level=None) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue whose writes run on a background thread.
+
+    The level defaults to LOG_LEVEL (INFO); debug calls below it cost only a
+    level check.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO").upper())
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    # httpx logs every outbound request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread.
+
+    The queue handler is removed too, so a later setup_logging() starts clean.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = _queue_handler = None
+_queue_handler = None